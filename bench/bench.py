@@ -0,0 +1,372 @@
+# Banc de performance et générateur de données synthétiques, hors du module servi par gunicorn
+# python bench/bench.py generate-data ... : remplit la base DATABASE_URL
+# python bench/bench.py run ... : mesure chaque route sur une base générée, compare à la référence
+import csv
+import datetime as dt_module
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import click
+from werkzeug.security import generate_password_hash
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+from app import (TAILLE_LOT_IMPORT, Planning, User, _cache_bilan, _cache_reponses, create_app, db, enregistrer_lot,
+                 init_data, migrer_schema, percentiles_histogramme, preparer_mouvements)
+
+# Application du processus courant (processus principal ou processus spawn du banc)
+_application = []
+
+def application():
+    if not _application:
+        _application.append(create_app())
+    return _application[0]
+
+# Environnement des processus lancés (spawn) : base, métriques et journal lent dans un dossier temporaire
+@contextmanager
+def environnement_temporaire(dossier, url_base, nom_base):
+    variables = {
+        'DATABASE_URL': url_base or 'sqlite:///' + os.path.join(dossier, nom_base),
+        'METRIQUES_DIR': os.path.join(dossier, 'metriques'),
+        'JOURNAL_LENT': os.path.join(dossier, 'lent.log'),
+        'COLONNES_DIR': os.path.join(dossier, 'colonnes'),
+    }
+    anciennes = {nom: os.environ.get(nom) for nom in variables}
+    os.environ.update(variables)
+    try:
+        yield
+    finally:
+        for nom, valeur in anciennes.items():
+            if valeur is None:
+                os.environ.pop(nom, None)
+            else:
+                os.environ[nom] = valeur
+
+# Générateur de données synthétiques reproductibles (même graine = mêmes mouvements)
+# Volume : mouvements_jour en moyenne les jours ouvrés, 30 % le week-end ; gros transporteurs en tête (loi de Zipf)
+TYPES_MVT = ("Réception", "Retour", "Expédition", "Restitution")
+MIX_MVT_DEFAUT = (40, 20, 30, 10)
+TRANSPORTEURS_GENERES = ["LOGITRANS", "TLOT", "LAMART", "Retour MTS", "Lagny", "Soissons"]
+
+def mouvements_synthetiques(annees=1, nb_transporteurs=12, mouvements_jour=40, mix=MIX_MVT_DEFAUT,
+                            fin=dt_module.date(2025, 12, 31), graine=0):
+    import random
+
+    rnd = random.Random(graine)
+    transporteurs = (TRANSPORTEURS_GENERES + [f"TRANSP {k:03d}" for k in range(1, nb_transporteurs + 1)])[:nb_transporteurs]
+    poids = [1 / (k + 1) for k in range(len(transporteurs))]
+    jour = fin - dt_module.timedelta(days=round(365.25 * annees) - 1)
+    numero = 0
+    while jour <= fin:
+        moyenne = mouvements_jour * (0.3 if jour.isoweekday() >= 6 else 1)
+        for _ in range(max(0, round(rnd.gauss(moyenne, moyenne ** 0.5)))):
+            numero += 1
+            type_mvt = rnd.choices(TYPES_MVT, weights=mix)[0]
+            plan = rnd.randint(5 * 60, 20 * 60)
+            tirage = rnd.random()
+            if tirage < 0.05:
+                arrivee = "Accroche"
+            elif tirage < 0.10:
+                arrivee = ""
+            else:
+                ecart = int(rnd.expovariate(1 / 25)) if tirage < 0.40 else -rnd.randint(0, 20)
+                minutes = min(plan + ecart, 23 * 60 + 59)
+                arrivee = f"{minutes // 60:02d}:{minutes % 60:02d}"
+            eur = rnd.randint(0, 33) if rnd.random() < 0.8 else 0
+            yield {
+                'date': jour.isoformat(), 'transporteur': rnd.choices(transporteurs, weights=poids)[0],
+                'type_mvt': type_mvt, 'reference': f"GEN-{graine}-{numero:07d}", 'quai': f"Q{rnd.randint(1, 8)}",
+                'palettes_eur': eur, 'palettes_shep': rnd.randint(0, 10) if rnd.random() < 0.2 else 0,
+                'palettes_lpr': rnd.randint(0, 10) if rnd.random() < 0.1 else 0,
+                'palettes_perdues': rnd.randint(1, 3) if rnd.random() < 0.05 else 0,
+                'heure_plan': f"{plan // 60:02d}:{plan % 60:02d}", 'heure_arr': arrivee,
+                'heure_dep': '', 'commentaire': '',
+            }
+        jour += dt_module.timedelta(days=1)
+
+# Remplir la base courante par lots, par le même chemin d'écriture que /api/enregistrer/lot
+def generer_donnees(**parametres):
+    totaux = {'planning': 0, 'entree': 0, 'sortie': 0}
+
+    def inserer(lot):
+        planning, entrees, sorties, erreurs = preparer_mouvements(lot)
+        if erreurs:
+            raise ValueError(f"Mouvements générés invalides : {erreurs}")
+        enregistrer_lot(planning, entrees, sorties)
+        totaux['planning'] += len(planning)
+        totaux['entree'] += len(entrees)
+        totaux['sortie'] += len(sorties)
+
+    lot = []
+    for mouvement in mouvements_synthetiques(**parametres):
+        lot.append(mouvement)
+        if len(lot) == TAILLE_LOT_IMPORT:
+            inserer(lot)
+            lot = []
+    if lot:
+        inserer(lot)
+    return totaux
+
+# Banc de performance : chaque route passe par le client de test sur une base générée
+# {…} est remplacé par des valeurs tirées des données (transporteur principal, dernier mois, semaine)
+# /api/evenements (flux SSE sans fin) et les exports en tâche de fond (/api/exports) ne sont pas mesurés
+ROUTES_BENCH = [
+    ('GET', '/login'),
+    ('POST', '/login'),
+    ('GET', '/'),
+    ('GET', '/api/transporteurs'),
+    ('GET', '/api/transporteurs/recherche?q=lo'),
+    ('GET', '/api/transporteurs/recherche?q=logitrnas'),
+    ('GET', '/api/planning'),
+    ('GET', '/api/planning?transporteur={transporteur}&date_debut={mois_debut}&date_fin={mois_fin}'),
+    ('GET', '/api/planning?type=Retour&limite=500'),
+    ('GET', '/api/planning?format=ndjson&date_debut={mois_debut}'),
+    ('GET', '/api/entree'),
+    ('GET', '/api/entree?transporteur={transporteur}'),
+    ('GET', '/api/sortie'),
+    ('GET', '/api/sortie?format=csv&date_debut={mois_debut}'),
+    ('GET', '/api/total_palettes'),
+    ('GET', '/api/total_palettes?semaine={semaine}'),
+    ('GET', '/api/total_palettes?date_debut={mois_debut}&date_fin={mois_fin}'),
+    ('GET', '/api/stats'),
+    ('GET', '/api/dashboard'),
+    ('GET', '/api/dashboard?sections=planning,entree,sortie&date_debut={mois_debut}&date_fin={mois_fin}'),
+    ('GET', '/api/kpi'),
+    ('GET', '/api/kpi?par=semaine,transporteur'),
+    ('GET', '/api/kpi?par=date,type_mvt&date_debut={mois_debut}&date_fin={mois_fin}'),
+    ('GET', '/export?date_debut={mois_debut}&date_fin={mois_fin}'),
+    ('GET', '/export'),
+    ('POST', '/api/enregistrer'),
+    ('POST', '/api/enregistrer/lot'),
+    ('POST', '/api/import?feuille=planning'),
+]
+BENCH_UTILISATEUR = ('BENCH', 'bench')
+
+# Vider les caches applicatifs : chaque mesure paie le coût complet de la route
+def vider_caches():
+    _cache_reponses.clear()
+    _cache_bilan['version'] = None
+    dossier = application().config['EXPORTS_DIR']
+    for nom in os.listdir(dossier) if os.path.isdir(dossier) else ():
+        if nom.endswith('.xlsx'):
+            os.remove(os.path.join(dossier, nom))
+
+def _corps_bench(methode, url, valeurs, rnd):
+    def mouvement():
+        m = next(mouvements_synthetiques(annees=1 / 365.25, mouvements_jour=50, fin=valeurs['fin'], graine=rnd.random()))
+        m['reference'] = f"BENCH-{rnd.randrange(10 ** 9)}"
+        return m
+
+    if methode == 'GET':
+        return {}
+    if url == '/login':
+        return {'data': {'username': BENCH_UTILISATEUR[0], 'password': BENCH_UTILISATEUR[1]}}
+    if url == '/api/enregistrer':
+        return {'json': mouvement()}
+    if url == '/api/enregistrer/lot':
+        return {'json': [mouvement() for _ in range(100)]}
+    # Import CSV de 100 lignes de planning au format de /api/planning?format=csv
+    colonnes = [c.name for c in Planning.__table__.columns if c.name != 'id']
+    tampon = io.StringIO()
+    ecrivain = csv.writer(tampon)
+    ecrivain.writerow(colonnes)
+    with application().app_context():
+        planning, _, _, _ = preparer_mouvements([mouvement() for _ in range(100)])
+    for ligne in planning:
+        ecrivain.writerow(['' if ligne.get(c) is None else ligne[c] for c in colonnes])
+    return {'data': {'fichier': (io.BytesIO(tampon.getvalue().encode('utf-8')), 'bench.csv')},
+            'content_type': 'multipart/form-data'}
+
+def mesurer_routes(repetitions=10, cache=False):
+    import random
+    import statistics
+    import tracemalloc
+
+    app = application()
+    rnd = random.Random(0)
+    with app.app_context():
+        fin = db.session.query(db.func.max(Planning.date)).scalar() or dt_module.date.today()
+        transporteur = db.session.query(Planning.transporteur).group_by(Planning.transporteur) \
+            .order_by(db.func.count().desc()).limit(1).scalar() or 'LOGITRANS'
+    mois_debut = fin.replace(day=1)
+    valeurs = {'fin': fin, 'transporteur': transporteur, 'mois_debut': mois_debut.isoformat(),
+               'mois_fin': fin.isoformat(), 'semaine': fin.isocalendar().week}
+
+    compteur = [0]
+
+    def compter(conn, cursor, statement, parameters, context, executemany):
+        compteur[0] += 1
+
+    client = app.test_client()
+    client.post('/login', data=_corps_bench('POST', '/login', valeurs, rnd)['data'])
+    resultats = {}
+    with app.app_context():
+        db.event.listen(db.engine, 'before_cursor_execute', compter)
+    try:
+        for methode, modele_url in ROUTES_BENCH:
+            url = modele_url.format(**valeurs)
+
+            def appeler():
+                if not cache:
+                    vider_caches()
+                corps = _corps_bench(methode, url.split('?')[0], valeurs, rnd)
+                compteur[0] = 0
+                debut = time.perf_counter()
+                reponse = client.open(url, method=methode, **corps)
+                taille = len(reponse.get_data())
+                duree = time.perf_counter() - debut
+                if reponse.status_code >= 400:
+                    raise RuntimeError(f"{methode} {url}: HTTP {reponse.status_code} {reponse.get_data(as_text=True)[:200]}")
+                return duree, compteur[0], taille
+
+            appeler()  # chauffe : imports paresseux, premiers plans de requête
+            mesures = [appeler() for _ in range(repetitions)]
+            # Pic mémoire sur un appel à part : tracemalloc ralentit l'exécution et fausserait les durées
+            tracemalloc.start()
+            appeler()
+            pic = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            durees = percentiles_histogramme([(d, 1) for d in sorted(m[0] for m in mesures)], (50, 95))
+            resultats[f"{methode} {modele_url}"] = {
+                'p50_ms': round(durees[50] * 1000, 2), 'p95_ms': round(durees[95] * 1000, 2),
+                'requetes': statistics.median_low(m[1] for m in mesures),
+                'memoire_ko': round(pic / 1024), 'octets': statistics.median_low(m[2] for m in mesures),
+            }
+    finally:
+        with app.app_context():
+            db.event.remove(db.engine, 'before_cursor_execute', compter)
+    return resultats
+
+def _executer_bench(parametres):
+    generation, repetitions, cache, dossier_exports = parametres
+    app = application()
+    app.config['EXPORTS_DIR'] = dossier_exports
+    with app.app_context():
+        migrer_schema()
+        init_data()
+        if not db.session.get(User, BENCH_UTILISATEUR[0]):
+            db.session.add(User(id=BENCH_UTILISATEUR[0], password=generate_password_hash(BENCH_UTILISATEUR[1])))
+            db.session.commit()
+        debut = time.perf_counter()
+        totaux = generer_donnees(**generation)
+        totaux['generation_s'] = round(time.perf_counter() - debut, 1)
+        totaux['base'] = db.engine.dialect.name
+    return totaux, mesurer_routes(repetitions, cache)
+
+# Exécuter le banc dans un processus neuf pointé sur une base vide (SQLite temporaire par défaut)
+def executer_bench(generation, repetitions=10, cache=False, url_base=None):
+    import multiprocessing
+
+    with tempfile.TemporaryDirectory() as dossier, environnement_temporaire(dossier, url_base, 'bench.db'):
+        with multiprocessing.get_context('spawn').Pool(1) as pool:
+            return pool.apply(_executer_bench, ((generation, repetitions, cache, os.path.join(dossier, 'exports')),))
+
+# Régressions par rapport à une référence : p95 et mémoire au-delà de la tolérance (avec un plancher de bruit),
+# ou toute requête SQL supplémentaire
+def comparer_bench(resultats, reference, tolerance=0.25):
+    regressions = []
+    for route, mesure in resultats.items():
+        base = reference.get(route)
+        if base is None:
+            continue
+        if mesure['p95_ms'] > base['p95_ms'] * (1 + tolerance) and mesure['p95_ms'] - base['p95_ms'] > 5:
+            regressions.append(f"{route}: p95 {base['p95_ms']} → {mesure['p95_ms']} ms")
+        if mesure['requetes'] > base['requetes']:
+            regressions.append(f"{route}: {base['requetes']} → {mesure['requetes']} requêtes")
+        if mesure['memoire_ko'] > base['memoire_ko'] * (1 + tolerance) and mesure['memoire_ko'] - base['memoire_ko'] > 256:
+            regressions.append(f"{route}: pic mémoire {base['memoire_ko']} → {mesure['memoire_ko']} Ko")
+    return regressions
+
+def _options_generation(f):
+    for option in reversed([
+        click.option('--annees', default=1.0, show_default=True, help="Années d'historique générées"),
+        click.option('--transporteurs', default=12, show_default=True, help="Nombre de transporteurs"),
+        click.option('--mouvements-jour', default=40, show_default=True, help="Mouvements par jour ouvré (en moyenne)"),
+        click.option('--mix', default=','.join(map(str, MIX_MVT_DEFAUT)), show_default=True,
+                     help="Poids Réception,Retour,Expédition,Restitution"),
+        click.option('--fin', default='2025-12-31', show_default=True, help="Dernier jour généré (AAAA-MM-JJ)"),
+        click.option('--graine', default=0, show_default=True, help="Graine du générateur"),
+    ]):
+        f = option(f)
+    return f
+
+def _parametres_generation(annees, transporteurs, mouvements_jour, mix, fin, graine):
+    poids = [float(p) for p in mix.split(',')]
+    if len(poids) != len(TYPES_MVT):
+        raise click.BadParameter(f"{len(TYPES_MVT)} poids attendus ({','.join(TYPES_MVT)})", param_hint='--mix')
+    return {'annees': annees, 'nb_transporteurs': transporteurs, 'mouvements_jour': mouvements_jour,
+            'mix': poids, 'fin': dt_module.date.fromisoformat(fin), 'graine': graine}
+
+@click.group()
+def cli():
+    pass
+
+# Commande : python bench/bench.py generate-data [--annees 2] [--mouvements-jour 80] ...
+# Ajoute les mouvements générés à la base courante (DATABASE_URL)
+@cli.command('generate-data')
+@_options_generation
+def generate_data_command(**options):
+    with application().app_context():
+        migrer_schema()
+        init_data()
+        totaux = generer_donnees(**_parametres_generation(**options))
+    print(f"{totaux['planning']} mouvements générés : {totaux['entree']} entrées, {totaux['sortie']} sorties")
+
+# Commande : python bench/bench.py run [--repetitions 10] [--enregistrer] [--base postgresql://...] ...
+# Génère une base, mesure chaque route puis compare à la référence (instance/bench_reference.json)
+@cli.command('run')
+@_options_generation
+@click.option('--repetitions', default=10, show_default=True, help="Appels mesurés par route")
+@click.option('--cache', is_flag=True, help="Garder les caches applicatifs entre les appels")
+@click.option('--base', default=None, help="URL d'une base vide à utiliser (SQLite temporaire par défaut)")
+@click.option('--reference', default=None, help="Fichier JSON de référence")
+@click.option('--enregistrer', is_flag=True, help="Enregistrer ces mesures comme nouvelle référence")
+@click.option('--tolerance', default=0.25, show_default=True, help="Dégradation tolérée du p95 et de la mémoire")
+def bench_command(repetitions, cache, base, reference, enregistrer, tolerance, **options):
+    generation = _parametres_generation(**options)
+    totaux, resultats = executer_bench(generation, repetitions, cache, base)
+    print(f"Base {totaux['base']} : {totaux['planning']} mouvements ({totaux['entree']} entrées, "
+          f"{totaux['sortie']} sorties) générés en {totaux['generation_s']} s")
+
+    chemin = reference or os.path.join(RACINE, 'instance', 'bench_reference.json')
+    parametres = {**options, 'repetitions': repetitions, 'cache': cache, 'base': totaux['base']}
+    precedente = None
+    if os.path.exists(chemin) and not enregistrer:
+        with open(chemin, encoding='utf-8') as f:
+            precedente = json.load(f)
+        if precedente['parametres'] != parametres:
+            print(f"Référence {chemin} mesurée avec d'autres paramètres : comparaison ignorée")
+            precedente = None
+
+    largeur = max(map(len, resultats))
+    print(f"{'route':<{largeur}} {'p50 ms':>9} {'p95 ms':>9} {'req.':>5} {'mém. Ko':>8} {'octets':>10} {'Δ p95':>7}")
+    for route, mesure in resultats.items():
+        ecart = ''
+        if precedente and route in precedente['routes'] and precedente['routes'][route]['p95_ms']:
+            ecart = f"{mesure['p95_ms'] / precedente['routes'][route]['p95_ms'] - 1:+.0%}"
+        print(f"{route:<{largeur}} {mesure['p50_ms']:>9} {mesure['p95_ms']:>9} {mesure['requetes']:>5} "
+              f"{mesure['memoire_ko']:>8} {mesure['octets']:>10} {ecart:>7}")
+
+    if enregistrer:
+        os.makedirs(os.path.dirname(chemin) or '.', exist_ok=True)
+        with open(chemin, 'w', encoding='utf-8') as f:
+            json.dump({'parametres': parametres, 'mesure_le': datetime.now().isoformat(timespec='seconds'),
+                       'routes': resultats}, f, ensure_ascii=False, indent=2)
+        print(f"Référence enregistrée : {chemin}")
+    elif precedente:
+        regressions = comparer_bench(resultats, precedente['routes'], tolerance)
+        for regression in regressions:
+            print(regression)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} régression(s) par rapport à {chemin} ({precedente['mesure_le']})")
+        print(f"Aucune régression par rapport à {chemin} ({precedente['mesure_le']})")
+
+if __name__ == '__main__':
+    cli()
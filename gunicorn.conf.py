@@ -0,0 +1,36 @@
+# Configuration gunicorn, lue automatiquement depuis le dossier de lancement (voir procfile)
+# L'application est chargée une seule fois dans le maître (preload) : les workers démarrent par fork, déjà chauds
+import multiprocessing
+import os
+import time
+
+# PostgreSQL : workers gevent, un flux /api/evenements ouvert (jusqu'à SSE_DUREE_MAX) n'occupe qu'une greenlet.
+# Le patch doit précéder tout import de l'application ; psycogreen rend les requêtes psycopg2 coopératives.
+# SQLite : le pilote sqlite3 n'est pas coopératif, une attente de verrou (jusqu'à SQLITE_BUSY_TIMEOUT_MS)
+# gèlerait toute la boucle du worker ; ces déploiements gardent des workers gthread
+if os.environ.get('DATABASE_URL', '').startswith(('postgres://', 'postgresql://')):
+    from gevent import monkey
+
+    monkey.patch_all()
+    from psycogreen.gevent import patch_psycopg
+
+    patch_psycopg()
+    worker_class = 'gevent'
+    worker_connections = 1000  # connexions simultanées par worker, flux SSE compris
+else:
+    worker_class = 'gthread'
+    threads = 8
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+preload_app = True
+
+# Les connexions ouvertes par le maître ne doivent pas être partagées entre processus : chaque worker repart d'un pool vide
+def post_fork(server, worker):
+    from app import db
+
+    worker.debut_demarrage = time.perf_counter()
+    with worker.app.wsgi().app_context():
+        db.engine.dispose(close=False)
+
+# Démarrage à froid de chaque worker, du fork à la première requête acceptée
+def post_worker_init(worker):
+    worker.log.info("Worker %s prêt en %.1f ms", worker.pid, (time.perf_counter() - worker.debut_demarrage) * 1000)
@@ -0,0 +1,122 @@
+import datetime as dt
+import os
+import random
+import uuid
+
+import pytest
+from sqlalchemy.engine import make_url
+
+import app as suivi
+
+# Base PostgreSQL des tests (DATABASE_URL) ; sans elle, les variantes PostgreSQL sont ignorées
+URL_POSTGRESQL = os.environ.get('DATABASE_URL', '')
+if not URL_POSTGRESQL.startswith(('postgresql://', 'postgres://')):
+    URL_POSTGRESQL = None
+
+
+# Caches du module (réponses, bilan, registre des transporteurs) : indexés par la version des données,
+# qui repart de zéro sur chaque base neuve
+def vider_caches():
+    suivi._cache_reponses.clear()
+    suivi._cache_reponses_etat['version'] = None
+    suivi._cache_bilan['version'] = None
+    suivi._registre_transporteurs[0] = None
+
+
+# Application sur une base neuve, dossiers de travail (exports, métriques, instantané) dans `dossier`
+# PostgreSQL : un schéma propre à l'application dans la base DATABASE_URL (search_path de chaque connexion)
+def creer_app(dossier, schema=None):
+    dossier.mkdir(parents=True, exist_ok=True)
+    if schema:
+        url = make_url(suivi.url_base_donnees(URL_POSTGRESQL)).update_query_dict({'options': f"-csearch_path={schema}"})
+        url = url.render_as_string(hide_password=False)
+    else:
+        url = 'sqlite:///' + str(dossier / 'suivi.db')
+    application = suivi.create_app({
+        'TESTING': True,
+        'LOGIN_DISABLED': True,
+        'SQLALCHEMY_DATABASE_URI': url,
+        'EXPORTS_DIR': str(dossier / 'exports'),
+        'METRIQUES_DIR': str(dossier / 'metriques'),
+        'JOURNAL_LENT': str(dossier / 'lent.log'),
+        'COLONNES_DIR': str(dossier / 'colonnes'),
+    })
+    vider_caches()
+    with application.app_context():
+        if schema:
+            with suivi.db.engine.begin() as conn:
+                conn.exec_driver_sql(f"CREATE SCHEMA {schema}")
+        suivi.migrer_schema()
+        suivi.init_data()
+    return application
+
+
+def supprimer_app(application, schema=None):
+    with application.app_context():
+        suivi.db.session.remove()
+        if schema:
+            with suivi.db.engine.begin() as conn:
+                conn.exec_driver_sql(f"DROP SCHEMA {schema} CASCADE")
+        suivi.db.engine.dispose()
+
+
+@pytest.fixture(params=['sqlite', 'postgresql'])
+def base(request):
+    if request.param == 'postgresql' and not URL_POSTGRESQL:
+        pytest.skip("DATABASE_URL ne désigne pas une base PostgreSQL")
+    return request.param
+
+
+# Fabrique d'applications sur la base testée, chacune sur sa propre base neuve : fabrique('cible')
+@pytest.fixture
+def fabrique_app(base, tmp_path):
+    creees = []
+
+    def fabrique(nom='source'):
+        schema = f"test_{uuid.uuid4().hex[:12]}" if base == 'postgresql' else None
+        application = creer_app(tmp_path / nom, schema)
+        creees.append((application, schema))
+        return application
+
+    yield fabrique
+    for application, schema in creees:
+        supprimer_app(application, schema)
+
+
+@pytest.fixture
+def app(fabrique_app):
+    return fabrique_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+# Mouvement valide pour /api/enregistrer, champs remplaçables
+def mouvement(**champs):
+    return {
+        'date': '2025-03-10', 'type_mvt': 'Réception', 'transporteur': 'Lagny', 'reference': 'R1', 'quai': 'Q1',
+        'palettes_eur': 10, 'palettes_shep': 2, 'palettes_lpr': 1, 'palettes_perdues': 0,
+        'heure_plan': '08:00', 'heure_arr': '08:20', 'heure_dep': '', 'commentaire': '',
+        **champs,
+    }
+
+
+# Mouvements de toutes les minutes de la journée, arrivées en avance, en retard, "Accroche" ou absentes
+def mouvements(nb, graine=0, debut=dt.date(2025, 12, 1), jours=31):
+    rnd = random.Random(graine)
+    for i in range(nb):
+        plan = rnd.randrange(24 * 60)
+        arrivee = rnd.choice(['', 'Accroche', None])
+        if arrivee is None:
+            minutes = min(max(plan + rnd.randint(-30, 90), 0), 24 * 60 - 1)
+            arrivee = f"{minutes // 60:02d}:{minutes % 60:02d}"
+        yield {
+            'date': (debut + dt.timedelta(days=rnd.randrange(jours))).isoformat(),
+            'type_mvt': rnd.choice(['Réception', 'Retour', 'Expédition', 'Restitution']),
+            'transporteur': rnd.choice(['LOGITRANS', 'TLOT', 'Lagny', 'Soissons']), 'reference': f"RT-{i}",
+            'quai': rnd.choice(['Q1', 'Q2', '']), 'palettes_eur': rnd.randint(0, 30), 'palettes_shep': rnd.randint(0, 3),
+            'palettes_lpr': rnd.randint(0, 3), 'palettes_perdues': rnd.randint(0, 2),
+            'heure_plan': f"{plan // 60:02d}:{plan % 60:02d}", 'heure_arr': arrivee, 'heure_dep': '', 'commentaire': 'aller-retour',
+        }
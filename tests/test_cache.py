@@ -0,0 +1,33 @@
+import pytest
+
+from conftest import mouvement
+
+
+# Endpoint JSON ordinaire : 304 tant que les données n'ont pas changé, 200 et nouvel ETag après une écriture
+@pytest.mark.parametrize('url', ['/api/planning', '/api/stats', '/api/total_palettes', '/api/transporteurs'])
+def test_etag_invalide_par_ecriture(client, url):
+    client.post('/api/enregistrer', json=mouvement())
+    premiere = client.get(url)
+    etag = premiere.headers['ETag']
+    assert premiere.status_code == 200
+
+    reponse = client.get(url, headers={'If-None-Match': etag})
+    assert reponse.status_code == 304
+    assert reponse.get_data() == b''
+    assert reponse.headers['ETag'] == etag
+
+    client.post('/api/enregistrer', json=mouvement(reference='R2', transporteur='TRANSPORTS DUVAL', palettes_eur=4))
+    reponse = client.get(url, headers={'If-None-Match': etag})
+    assert reponse.status_code == 200
+    assert reponse.headers['ETag'] != etag
+    assert reponse.get_json() != premiere.get_json()
+    assert client.get(url, headers={'If-None-Match': reponse.headers['ETag']}).status_code == 304
+
+
+# Paramètres différents, représentations différentes : un ETag ne vaut que pour sa propre requête
+def test_etag_par_parametres(client):
+    client.post('/api/enregistrer', json=mouvement())
+    etag = client.get('/api/planning').headers['ETag']
+    reponse = client.get('/api/planning?transporteur=Lagny', headers={'If-None-Match': etag})
+    assert reponse.status_code == 200
+    assert reponse.headers['ETag'] != etag
@@ -0,0 +1,40 @@
+import gzip
+import json
+
+from conftest import mouvement
+
+URL = '/api/dashboard?sections=planning,entree,sortie'
+
+
+def remplir(client):
+    for i in range(20):
+        client.post('/api/enregistrer', json=mouvement(reference=f"GZ-{i}"))
+
+
+# Représentations brute et gzip : mêmes données, ETag distincts, Vary: Accept-Encoding sur les deux
+def test_etag_par_codage(client):
+    remplir(client)
+    brute = client.get(URL)
+    compressee = client.get(URL, headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in brute.headers
+    assert compressee.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(compressee.get_data())) == brute.get_json()
+    assert compressee.headers['ETag'] != brute.headers['ETag']
+    assert all('Accept-Encoding' in r.headers['Vary'] for r in (brute, compressee))
+
+
+# Revalidation : 304 avec l'ETag présenté par le client, quel que soit le codage
+def test_revalidation_par_codage(client):
+    remplir(client)
+    for en_tetes in ({}, {'Accept-Encoding': 'gzip'}):
+        premiere = client.get(URL, headers=en_tetes)
+        etag = premiere.headers['ETag']
+        reponse = client.get(URL, headers={**en_tetes, 'If-None-Match': etag})
+        assert reponse.status_code == 304
+        assert reponse.headers['ETag'] == etag
+        assert 'Accept-Encoding' in reponse.headers['Vary']
+
+    # Données modifiées : l'ETag gzip périmé ne donne plus de 304
+    etag = client.get(URL, headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    client.post('/api/enregistrer', json=mouvement(reference='GZ-nouveau'))
+    assert client.get(URL, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag}).status_code == 200
@@ -0,0 +1,68 @@
+import math
+
+from hypothesis import given, strategies as st
+
+import app as suivi
+
+
+# Égalité stricte, type compris (0 entier pour "pas de retard", 0.0 ne convient pas)
+def identiques(obtenu, attendu):
+    return len(obtenu) == len(attendu) and all(o == a and type(o) is type(a) for o, a in zip(obtenu, attendu))
+
+
+MINUTES = st.sampled_from(suivi._LIBELLES_MINUTES)
+SAISIES = st.one_of(
+    MINUTES,
+    st.sampled_from(["", "Accroche", None, "8:5", " 7:00", "24:00", "99:99", "-1:30", "ab", "12:", "1:2:3"]),
+    st.builds(lambda h, m, forme: forme.format(h=h, m=m), st.integers(-30, 130), st.integers(-70, 130),
+              st.sampled_from(["{h}:{m}", "{h:02d}:{m:02d}", "{h}h{m}", " {h}:{m} "])),
+    st.text(max_size=8),
+)
+DECIMAUX = st.one_of(
+    MINUTES.map(suivi._DECIMAL_PAR_LIBELLE.get),
+    st.sampled_from([None, "", 0, 0.0, 1.0, 1.5, -0.01]),
+    st.floats(-0.5, 4.5),
+    st.builds(lambda a, b: suivi._DECIMAL_PAR_LIBELLE[a] - suivi._DECIMAL_PAR_LIBELLE[b], MINUTES, MINUTES),
+)
+
+
+def test_minutes_de_la_journee():
+    libelles = suivi._LIBELLES_MINUTES
+    decimaux = [suivi.time_to_decimal(l) for l in libelles]
+    assert identiques(suivi.time_to_decimal_lot(libelles), decimaux)
+    assert identiques(suivi.decimal_to_time_lot(decimaux), [suivi.decimal_to_time(d) for d in decimaux])
+
+
+# Toutes les paires (heure planifiée, heure d'arrivée) de la journée
+def test_retard_toutes_paires():
+    plans = [p for p in suivi._LIBELLES_MINUTES for _ in suivi._LIBELLES_MINUTES]
+    arrivees = suivi._LIBELLES_MINUTES * len(suivi._LIBELLES_MINUTES)
+    assert identiques(suivi.calculer_retard_lot(plans, arrivees),
+                      [suivi.calculer_retard(p, a) for p, a in zip(plans, arrivees)])
+
+
+@given(st.lists(SAISIES))
+def test_time_to_decimal_lot(valeurs):
+    assert identiques(suivi.time_to_decimal_lot(valeurs), [suivi.time_to_decimal(v) for v in valeurs])
+
+
+@given(st.lists(DECIMAUX))
+def test_decimal_to_time_lot(valeurs):
+    assert identiques(suivi.decimal_to_time_lot(valeurs), [suivi.decimal_to_time(v) for v in valeurs])
+
+
+@given(st.lists(st.tuples(SAISIES, SAISIES)))
+def test_calculer_retard_lot(paires):
+    plans, arrivees = [p for p, _ in paires], [a for _, a in paires]
+    assert identiques(suivi.calculer_retard_lot(plans, arrivees),
+                      [suivi.calculer_retard(p, a) for p, a in paires])
+
+
+# Une heure relue à quelques ULP près retombe sur la valeur exacte de sa minute
+@given(MINUTES, st.integers(-4, 4))
+def test_decimal_a_la_minute(libelle, ulps):
+    valeur = suivi._DECIMAL_PAR_LIBELLE[libelle]
+    for _ in range(abs(ulps)):
+        valeur = math.nextafter(valeur, math.copysign(math.inf, ulps))
+    assert suivi.libelle_a_la_minute(valeur) == libelle
+    assert suivi.decimal_a_la_minute(valeur) == suivi.time_to_decimal(libelle)
@@ -0,0 +1,34 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Dépendances lourdes chargées seulement à leur première utilisation (imports, exports)
+MODULES_DIFFERES = ('pandas', 'numpy', 'openpyxl')
+NB_ESSAIS = 5
+# Borne sur la médiane import + create_app(), ajustable pour une machine d'intégration plus lente
+DEMARRAGE_MAX_MS = float(os.environ.get('DEMARRAGE_MAX_MS', 1500))
+
+SCRIPT = ("import json, sys, time\n"
+          "debut = time.perf_counter()\n"
+          "import app\n"
+          "app.create_app()\n"
+          "duree = (time.perf_counter() - debut) * 1000\n"
+          f"print(json.dumps({{'ms': duree, 'modules': [m for m in {MODULES_DIFFERES!r} if m in sys.modules]}}))\n")
+
+
+# Démarrage à froid dans un interpréteur neuf : import du module + create_app(), médiane sur quelques essais
+def test_demarrage_a_froid(tmp_path):
+    racine = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + str(tmp_path / 'suivi.db'),
+               METRIQUES_DIR=str(tmp_path / 'metriques'), JOURNAL_LENT=str(tmp_path / 'lent.log'),
+               COLONNES_DIR=str(tmp_path / 'colonnes'))
+    essais = []
+    for _ in range(NB_ESSAIS):
+        sortie = subprocess.run([sys.executable, '-c', SCRIPT], cwd=racine, env=env, capture_output=True, text=True,
+                                check=True)
+        essais.append(json.loads(sortie.stdout.strip().splitlines()[-1]))
+    assert all(e['modules'] == [] for e in essais), essais
+    mediane = statistics.median(e['ms'] for e in essais)
+    assert mediane < DEMARRAGE_MAX_MS, f"Démarrage à froid trop lent : {mediane:.0f} ms > {DEMARRAGE_MAX_MS:.0f} ms"
@@ -0,0 +1,50 @@
+import datetime as dt
+
+from sqlalchemy.exc import OperationalError
+
+import app as suivi
+from conftest import mouvement
+
+
+# Une autre connexion peut-elle ouvrir une transaction d'écriture maintenant (sans attendre) ?
+def verrou_disponible(engine):
+    with engine.connect() as autre:
+        if engine.dialect.name == 'postgresql':
+            return autre.execute(suivi.db.text('SELECT pg_try_advisory_xact_lock(:cle)'),
+                                 {'cle': suivi.VERROU_ECRITURE}).scalar()
+        autre.connection.driver_connection.execute('PRAGMA busy_timeout = 0')
+        try:
+            autre.execution_options(ecriture=True).exec_driver_sql('SELECT 1')
+            return True
+        except OperationalError:
+            return False
+        finally:
+            autre.invalidate()  # busy_timeout modifié : la connexion ne retourne pas au pool
+
+
+def test_debuter_ecriture_verrou_exclusif(app):
+    with app.app_context():
+        suivi.debuter_ecriture()
+        assert not verrou_disponible(suivi.db.engine)
+        suivi.db.session.commit()
+        assert verrou_disponible(suivi.db.engine)
+
+
+def test_insert_dialecte_sans_doublon(app):
+    with app.app_context():
+        for _ in range(2):
+            suivi.debuter_ecriture()
+            suivi.db.session.execute(suivi.insert_dialecte(suivi.Transporteur).on_conflict_do_nothing(index_elements=['name']),
+                                     [{'name': 'DOUBLON'}])
+            suivi.db.session.commit()
+        assert suivi.Transporteur.query.filter_by(name='DOUBLON').count() == 1
+
+
+# Deux mouvements du même jour, transporteur et type : une seule ligne d'agrégat, mesures additionnées
+def test_agregats_cumules(app, client):
+    for reference, eur in (('A1', 10), ('A2', 7)):
+        assert client.post('/api/enregistrer', json=mouvement(reference=reference, palettes_eur=eur)).status_code == 200
+    with app.app_context():
+        agregat = suivi.db.session.get(suivi.AgregatJour, (dt.date(2025, 3, 10), 'Lagny', 'Réception'))
+        assert (agregat.nb_planning, agregat.nb_mouvements, agregat.eur) == (2, 2, 17)
+        assert suivi.verifier_agregats() == []
@@ -0,0 +1,47 @@
+import random
+import threading
+
+import app as suivi
+from conftest import mouvement
+
+ECRIVAINS = 8
+MOUVEMENTS = 25
+TRANSPORTEURS = [f"STRESS {k}" for k in range(5)] + ["LOGITRANS"]
+
+
+# Un écrivain : son propre client, départ synchronisé avec les autres, échecs relevés
+def ecrire(app, numero, depart, echecs):
+    rnd = random.Random(numero)
+    client = app.test_client()
+    depart.wait()
+    for i in range(MOUVEMENTS):
+        reponse = client.post('/api/enregistrer', json=mouvement(
+            date=f"2025-03-{rnd.randint(1, 28):02d}", transporteur=rnd.choice(TRANSPORTEURS),
+            type_mvt=rnd.choice(["Réception", "Expédition", "Restitution", "Retour"]), reference=f"STRESS-{numero}-{i}",
+            palettes_eur=rnd.randint(0, 30), palettes_perdues=rnd.randint(0, 3),
+        ))
+        if reponse.status_code != 200:
+            echecs.append(f"STRESS-{numero}-{i}: HTTP {reponse.status_code} {reponse.get_data(as_text=True)[:200]}")
+
+
+# Écrivains concurrents sur /api/enregistrer : aucune insertion perdue ni en échec, registre et agrégats cohérents
+def test_ecritures_concurrentes(app):
+    with app.app_context():
+        transporteurs_initiaux = suivi.Transporteur.query.count()
+    depart = threading.Barrier(ECRIVAINS)
+    echecs = []
+    ecrivains = [threading.Thread(target=ecrire, args=(app, n, depart, echecs)) for n in range(ECRIVAINS)]
+    for ecrivain in ecrivains:
+        ecrivain.start()
+    for ecrivain in ecrivains:
+        ecrivain.join()
+
+    assert echecs == []
+    attendu = ECRIVAINS * MOUVEMENTS
+    with app.app_context():
+        assert suivi.db.session.query(suivi.db.func.count(suivi.db.distinct(suivi.Planning.reference))).scalar() == attendu
+        assert suivi.Entree.query.count() + suivi.Sortie.query.count() == attendu
+        assert suivi.Evenement.query.count() == min(attendu, suivi.EVENEMENTS_CONSERVES)
+        assert suivi.Transporteur.query.count() == transporteurs_initiaux + len(TRANSPORTEURS) - 1
+        assert suivi.verifier_stock_jour() == []
+        assert suivi.verifier_agregats() == []
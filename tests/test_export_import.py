@@ -0,0 +1,47 @@
+import io
+
+import pytest
+
+from conftest import mouvement, mouvements, vider_caches
+
+
+def lire_tout(client):
+    vider_caches()
+    return {url: client.get(url + '?limite=10000').get_json()
+            for url in ('/api/planning', '/api/entree', '/api/sortie', '/api/total_palettes', '/api/stats')}
+
+
+# Un classeur /export réimporté dans une base vide redonne exactement les mêmes lignes
+# (les sommes de retards ne dépendent que de l'ordre d'insertion, qui change avec les id)
+def test_export_puis_import_sans_perte(app, client, fabrique_app):
+    assert client.post('/api/enregistrer/lot', json=list(mouvements(800))).status_code == 200
+    attendu = lire_tout(client)
+    classeur = client.get('/export?date_debut=2025-12-01&date_fin=2025-12-31').get_data()
+
+    cible = fabrique_app('cible')
+    reponse = cible.test_client().post('/api/import', data={'fichier': (io.BytesIO(classeur), 'export.xlsx')},
+                                        content_type='multipart/form-data')
+    assert reponse.status_code == 200, reponse.get_data(as_text=True)
+    assert reponse.get_json()['erreurs'] == []
+    obtenu = lire_tout(cible.test_client())
+    for cle in ('total_retard', 'average_retard'):
+        assert obtenu['/api/stats'].pop(cle) == pytest.approx(attendu['/api/stats'].pop(cle), rel=1e-12)
+    assert obtenu == attendu
+
+
+# Un élément du lot qui n'est pas un objet est signalé à son indice, les autres sont enregistrés
+def test_lot_element_invalide(client):
+    lot = [mouvement(), 3, None, 'texte', [1, 2], mouvement(reference='R2')]
+    reponse = client.post('/api/enregistrer/lot', json=lot)
+    assert reponse.status_code == 200
+    assert reponse.get_json()['inseres'] == 2
+    assert [e['indice'] for e in reponse.get_json()['erreurs']] == [1, 2, 3, 4]
+
+
+# Un fichier qui n'est pas un classeur, même nommé .xlsx, est refusé proprement
+@pytest.mark.parametrize('contenu', [b'', b'date;transporteur\n2025-03-10;Lagny\n', b'PK\x03\x04tronque'])
+def test_import_fichier_illisible(client, contenu):
+    reponse = client.post('/api/import', data={'fichier': (io.BytesIO(contenu), 'faux.xlsx')},
+                          content_type='multipart/form-data')
+    assert reponse.status_code == 400
+    assert 'error' in reponse.get_json()
@@ -0,0 +1,66 @@
+import json
+
+import app as suivi
+from conftest import mouvement
+
+
+def test_flux_csv_type_contenu(client):
+    client.post('/api/enregistrer', json=mouvement(type_mvt='Expédition', transporteur='TLOT'))
+    reponse = client.get('/api/sortie?format=csv')
+    assert reponse.status_code == 200
+    assert reponse.headers['Content-Type'] == 'text/csv; charset=utf-8'
+    lignes = reponse.get_data(as_text=True).lstrip('\ufeff').splitlines()
+    assert lignes[0].startswith('Type,Semaine,Date,Transp')
+    assert len(lignes) == 2
+
+
+def test_flux_ndjson(client):
+    for i in range(3):
+        client.post('/api/enregistrer', json=mouvement(reference=f"R{i}"))
+    reponse = client.get('/api/planning?format=ndjson')
+    assert reponse.headers['Content-Type'] == 'application/x-ndjson'
+    lignes = [json.loads(l) for l in reponse.get_data(as_text=True).splitlines()]
+    assert sorted(l['Référence'] for l in lignes) == ['R0', 'R1', 'R2']
+
+
+# Messages d'un flux SSE : [{'id': ..., 'event': ..., 'data': ...}] (commentaires et retry ignorés)
+def messages_sse(texte):
+    messages = []
+    for bloc in texte.split('\n\n'):
+        champs = dict(ligne.split(': ', 1) for ligne in bloc.splitlines() if ': ' in ligne and not ligne.startswith(':'))
+        if 'event' in champs:
+            messages.append(champs)
+    return messages
+
+
+def lire_evenements(client, **en_tetes):
+    return messages_sse(client.get('/api/evenements', headers=en_tetes).get_data(as_text=True))
+
+
+# Reprise après coupure : seuls les événements postérieurs au Last-Event-ID sont rejoués, dans l'ordre
+def test_evenements_rejeu_last_event_id(client, monkeypatch):
+    monkeypatch.setattr(suivi, 'SSE_DUREE_MAX', 0.2)
+    monkeypatch.setattr(suivi, 'SSE_INTERVALLE', 0.05)
+    assert lire_evenements(client) == []
+    for i in range(3):
+        client.post('/api/enregistrer', json=mouvement(reference=f"R{i}"))
+
+    tous = lire_evenements(client, **{'Last-Event-ID': '0'})
+    assert [json.loads(m['data'])['planning']['Référence'] for m in tous] == ['R0', 'R1', 'R2']
+    assert all(m['event'] == 'mouvement' for m in tous)
+
+    rejoues = lire_evenements(client, **{'Last-Event-ID': tous[0]['id']})
+    assert [m['id'] for m in rejoues] == [m['id'] for m in tous[1:]]
+    assert [json.loads(m['data'])['planning']['Référence'] for m in rejoues] == ['R1', 'R2']
+    assert lire_evenements(client, **{'Last-Event-ID': tous[-1]['id']}) == []
+
+
+# Événements manqués déjà purgés du journal : un reset demande au client de tout recharger
+def test_evenements_reset_apres_purge(client, monkeypatch):
+    monkeypatch.setattr(suivi, 'SSE_DUREE_MAX', 0.2)
+    monkeypatch.setattr(suivi, 'SSE_INTERVALLE', 0.05)
+    monkeypatch.setattr(suivi, 'EVENEMENTS_CONSERVES', 2)
+    for i in range(5):
+        client.post('/api/enregistrer', json=mouvement(reference=f"R{i}"))
+    messages = lire_evenements(client, **{'Last-Event-ID': '1'})
+    assert [m['event'] for m in messages] == ['reset']
@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+import app as suivi
+from conftest import mouvement, mouvements, vider_caches
+
+
+def bilan_instantane():
+    return suivi.bilan_colonnes(suivi.actualiser_instantane())
+
+
+def bilan_sql():
+    bilan = suivi.calculer_bilan()
+    return dict(bilan, soldes={transp: tuple(solde) for transp, solde in bilan['soldes'].items()})
+
+
+def identiques(obtenu, attendu):
+    obtenu, attendu = dict(obtenu), dict(attendu)
+    assert obtenu.pop('total_retard') == pytest.approx(attendu.pop('total_retard'), rel=1e-9, abs=1e-9)
+    assert obtenu == attendu
+
+
+# Le bilan de l'instantané en colonnes égale celui des tables, avant et après une écriture (segment ajouté)
+def test_bilan_instantane_egal_bilan_sql(app, client):
+    assert client.post('/api/enregistrer/lot', json=list(mouvements(400))).status_code == 200
+    with app.app_context():
+        identiques(bilan_instantane(), bilan_sql())
+        generation = suivi.actualiser_instantane().manifeste['generation']
+
+    assert client.post('/api/enregistrer', json=mouvement(transporteur='Soissons', palettes_eur=7)).status_code == 200
+    assert client.post('/api/enregistrer', json=mouvement(type_mvt='Expédition', palettes_eur=3)).status_code == 200
+    with app.app_context():
+        identiques(bilan_instantane(), bilan_sql())
+        assert suivi.actualiser_instantane().manifeste['generation'] == generation + 1
+
+
+# Manifeste tronqué ou incomplet, tableau .npy corrompu : le bilan est recalculé en SQL
+CORRUPTIONS = {
+    'manifeste_tronque': ('manifeste.json', b'{"base": "'),
+    'manifeste_incomplet': ('manifeste.json', b'{"base": "x"}'),
+    'npy_corrompu': ('.npy', b'\x93NUMPY corrompu'),
+}
+
+
+@pytest.mark.parametrize('corruption', CORRUPTIONS)
+def test_bilan_instantane_illisible(app, client, corruption):
+    suffixe, contenu = CORRUPTIONS[corruption]
+    assert client.post('/api/enregistrer/lot', json=list(mouvements(50))).status_code == 200
+    with app.app_context():
+        suivi.actualiser_instantane()
+        dossier = app.config['COLONNES_DIR']
+        for nom in os.listdir(dossier):
+            if nom.endswith(suffixe):
+                with open(os.path.join(dossier, nom), 'wb') as f:
+                    f.write(contenu)
+        suivi._instantanes.clear()
+        vider_caches()
+        identiques(suivi.bilan_partenaires(), bilan_sql())
+    assert client.get('/api/stats').status_code == 200
@@ -0,0 +1,73 @@
+import pytest
+
+from conftest import mouvement
+
+# (date, type, transporteur, EUR, SHEP, LPR, perdues, heure planifiée, heure d'arrivée) : retards de 20, 50, 0,
+# 10 et 5 minutes ; 2025-03-10 au 12 en semaine 11, le 17 en semaine 12
+JEU = [
+    ('2025-03-10', 'Réception', 'Lagny', 10, 2, 0, 1, '08:00', '08:20'),
+    ('2025-03-11', 'Réception', 'Lagny', 6, 0, 0, 0, '09:00', '09:50'),
+    ('2025-03-12', 'Expédition', 'Lagny', 8, 0, 0, 0, '10:00', '10:00'),
+    ('2025-03-17', 'Réception', 'Lagny', 4, 0, 0, 0, '07:00', '07:10'),
+    ('2025-03-10', 'Réception', 'TLOT', 5, 0, 0, 0, '08:00', '08:05'),
+]
+
+# Valeurs calculées à la main sur JEU
+LAGNY = {
+    'transporteur': 'Lagny', 'nb_planning': 4, 'nb_pals': 31, 'nb_retards': 3, 'nb_mouvements': 4,
+    'eur': 28, 'shep': 2, 'lpr': 0, 'perdue': 1, 'total': 31,
+    'retard_moyen': 20.0,  # (20 + 50 + 0 + 10) / 4
+    'taux_retard': 0.75, 'taux_perte': 0.0323,  # 1 / 31
+    'retard_p50': 10, 'retard_p90': 50, 'retard_p95': 50,  # rangs 2, 4 et 4 de [0, 10, 20, 50]
+}
+TLOT = {
+    'transporteur': 'TLOT', 'nb_planning': 1, 'nb_pals': 5, 'nb_retards': 1, 'nb_mouvements': 1,
+    'eur': 5, 'shep': 0, 'lpr': 0, 'perdue': 0, 'total': 5,
+    'retard_moyen': 5.0, 'taux_retard': 1.0, 'taux_perte': 0.0,
+    'retard_p50': 5, 'retard_p90': 5, 'retard_p95': 5,
+}
+
+
+@pytest.fixture
+def jeu(client):
+    for i, (date, type_mvt, transporteur, eur, shep, lpr, perdues, plan, arrivee) in enumerate(JEU):
+        reponse = client.post('/api/enregistrer', json=mouvement(
+            date=date, type_mvt=type_mvt, transporteur=transporteur, reference=f"K{i}", palettes_eur=eur,
+            palettes_shep=shep, palettes_lpr=lpr, palettes_perdues=perdues, heure_plan=plan, heure_arr=arrivee))
+        assert reponse.status_code == 200
+    return client
+
+
+def kpi(client, requete):
+    reponse = client.get('/api/kpi?' + requete)
+    assert reponse.status_code == 200, reponse.get_data(as_text=True)
+    return reponse.get_json()
+
+
+def test_kpi_par_transporteur(jeu):
+    resultat = kpi(jeu, 'par=transporteur')
+    assert resultat['source'] == 'agregat_semaine'
+    assert resultat['lignes'] == [LAGNY, TLOT]
+
+
+def test_kpi_par_semaine(jeu):
+    lignes = kpi(jeu, 'par=semaine,transporteur&transporteur=Lagny')['lignes']
+    assert [(l['annee'], l['semaine'], l['nb_planning'], l['nb_pals'], l['retard_moyen']) for l in lignes] == [
+        (2025, 11, 3, 27, 23.3),  # (20 + 50 + 0) / 3
+        (2025, 12, 1, 4, 10.0),
+    ]
+    assert [l['retard_p50'] for l in lignes] == [20, 10]
+
+
+# Filtre par date ou dimension type_mvt : tranches journalières
+def test_kpi_par_type_et_periode(jeu):
+    resultat = kpi(jeu, 'par=type_mvt&date_debut=2025-03-11')
+    assert resultat['source'] == 'agregat_jour'
+    assert [(l['type_mvt'], l['nb_planning'], l['eur'], l['nb_retards'], l['taux_retard'], l['retard_p90'])
+            for l in resultat['lignes']] == [('Expédition', 1, 8, 0, 0.0, 0), ('Réception', 2, 10, 2, 1.0, 50)]
+
+
+def test_kpi_percentiles_demandes(jeu):
+    lignes = kpi(jeu, 'par=transporteur&transporteur=Lagny&percentiles=25,75,100')['lignes']
+    assert {k: v for k, v in lignes[0].items() if k.startswith('retard_p')} == {
+        'retard_p25': 0, 'retard_p75': 20, 'retard_p100': 50}
@@ -0,0 +1,33 @@
+import os
+
+import app as suivi
+from conftest import mouvement
+
+
+def test_metriques_prometheus(client):
+    client.post('/api/enregistrer', json=mouvement())
+    client.get('/api/planning')
+    reponse = client.get('/metrics')
+    assert reponse.status_code == 200
+    assert reponse.headers['Content-Type'] == 'text/plain; version=0.0.4; charset=utf-8'
+    texte = reponse.get_data(as_text=True)
+    assert 'suivi_palettes_http_requetes_total{endpoint="suivi.api_planning"' in texte
+
+
+def test_server_timing(client):
+    reponse = client.get('/api/planning')
+    assert 'sql;dur=' in reponse.headers['Server-Timing']
+
+
+# Journal des requêtes lentes : un fichier par processus, jamais partagé entre workers gunicorn
+def test_journal_lent_par_processus(app, client, monkeypatch):
+    dossier = os.path.dirname(app.config['JOURNAL_LENT'])
+    ancien = os.path.join(dossier, 'lent.1.log')
+    with open(ancien, 'w') as f:
+        f.write("worker arrêté\n")
+    os.utime(ancien, (0, 0))
+    monkeypatch.setattr(suivi, 'SEUIL_REQUETE_LENTE_MS', 0)
+    client.get('/api/planning')
+    assert not os.path.exists(ancien)
+    with open(os.path.join(dossier, f"lent.{os.getpid()}.log"), encoding='utf-8') as f:
+        assert 'HTTP' in f.read()
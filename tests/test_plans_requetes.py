@@ -0,0 +1,82 @@
+import pytest
+
+import app as suivi
+from conftest import mouvement
+
+# Requêtes filtrées des endpoints de lecture qui doivent passer par un index
+REQUETES_INDEXEES = [
+    '/api/planning?date_debut=2025-01-01&date_fin=2025-01-31',
+    '/api/planning?transporteur=LOGITRANS',
+    '/api/planning?transporteur=LOGITRANS&date_debut=2025-01-01&date_fin=2025-01-31',
+    '/api/planning?type=Retour',
+    '/api/planning?type=Retour&transporteur=LOGITRANS',
+    '/api/planning?quai=Q1',
+    '/api/planning?quai=Q1&date_debut=2025-01-01',
+    '/api/planning?transporteur=LOGITRANS&apres=2025-01-10,42&limite=50',
+    '/api/entree?date_debut=2025-01-01&date_fin=2025-01-31',
+    '/api/entree?transporteur=LOGITRANS',
+    '/api/entree?transporteur=LOGITRANS&date_debut=2025-01-01',
+    '/api/entree?date_debut=2025-01-01&date_fin=2025-12-31&format=ndjson',
+    '/api/sortie?date_debut=2025-01-01&date_fin=2025-01-31',
+    '/api/sortie?transporteur=LOGITRANS',
+    '/api/sortie?transporteur=LOGITRANS&date_fin=2025-01-31',
+    '/api/sortie?transporteur=LOGITRANS&format=csv',
+    '/api/total_palettes?date_debut=2025-01-01&date_fin=2025-01-31',
+    '/api/total_palettes?semaine=12',
+    '/api/kpi?transporteur=LOGITRANS',
+    '/api/kpi?par=semaine,transporteur&annee=2025&semaine=12',
+    '/api/kpi?par=date,type_mvt&date_debut=2025-01-01&date_fin=2025-01-31',
+    '/api/kpi?par=type_mvt&transporteur=LOGITRANS&date_debut=2025-01-01',
+]
+
+
+# SELECT émis par l'endpoint, relevés sur le moteur
+def requetes_emises(app, client, url):
+    requetes = []
+
+    def capturer(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            requetes.append((statement, parameters))
+
+    suivi._cache_reponses.clear()  # un succès du cache masquerait le SQL de l'endpoint
+    with app.app_context():
+        suivi.db.event.listen(suivi.db.engine, 'before_cursor_execute', capturer)
+        try:
+            reponse = client.get(url)
+            reponse.get_data()  # consomme les réponses en flux
+        finally:
+            suivi.db.event.remove(suivi.db.engine, 'before_cursor_execute', capturer)
+    assert reponse.status_code == 200, reponse.get_data(as_text=True)
+    return requetes
+
+
+# Parcours complets d'une table dans le plan de chaque requête
+# (SQLite : "SCAN <table>" ; PostgreSQL : "Seq Scan on <table>" malgré enable_seqscan=off, donc sans index utilisable)
+def parcours_complets(app, requetes):
+    tables = set(suivi.db.metadata.tables)
+    scans = []
+    with app.app_context():
+        postgresql = suivi.db.engine.dialect.name == 'postgresql'
+        with suivi.db.engine.connect() as conn:
+            if postgresql:
+                conn.exec_driver_sql('SET enable_seqscan = off')
+            for statement, parameters in requetes:
+                explain = ('EXPLAIN ' if postgresql else 'EXPLAIN QUERY PLAN ') + statement
+                for ligne in conn.exec_driver_sql(explain, parameters):
+                    detail = ligne[-1]
+                    if postgresql:
+                        mots = detail.split('Seq Scan on ', 1)
+                        complet = len(mots) == 2 and mots[1].split()[0].strip('"') in tables
+                    else:
+                        mots = detail.split()
+                        complet = len(mots) == 2 and mots[0] == 'SCAN' and mots[1] in tables
+                    if complet:
+                        scans.append((detail.strip(), statement))
+            conn.rollback()
+    return scans
+
+
+@pytest.mark.parametrize('url', REQUETES_INDEXEES)
+def test_requetes_filtrees_indexees(app, client, url):
+    client.post('/api/enregistrer', json=mouvement(transporteur='LOGITRANS', date='2025-01-10'))
+    assert parcours_complets(app, requetes_emises(app, client, url)) == []
@@ -0,0 +1,45 @@
+import pytest
+
+from conftest import mouvement
+
+
+def rechercher(client, q, limite=10):
+    reponse = client.get('/api/transporteurs/recherche', query_string={'q': q, 'limite': limite})
+    assert reponse.status_code == 200
+    return reponse.get_json()
+
+
+# Recherche insensible aux accents et à la casse
+@pytest.mark.parametrize('q', ['lâgny', 'LAGNY', 'Lagny', ' lagny '])
+def test_recherche_accents_casse(client, q):
+    assert rechercher(client, q) == ['Lagny']
+
+
+# Autocomplétion : début du nom entier d'abord, puis début d'un mot du nom
+def test_recherche_prefixe(client):
+    assert rechercher(client, 'l', limite=3) == ['LAMART', 'LOGITRANS', 'Lagny']
+    assert rechercher(client, 'lo') == ['LOGITRANS']
+    assert rechercher(client, 'ret') == ['Retour MTS']
+    assert rechercher(client, 'mts') == ['Retour MTS']
+    client.post('/api/enregistrer', json=mouvement(transporteur='MTS Logistique'))
+    assert rechercher(client, 'mts') == ['MTS Logistique', 'Retour MTS']
+
+
+# Fautes de frappe : noms approchants
+@pytest.mark.parametrize('q, attendu', [('logitrnas', ['LOGITRANS']), ('soisons', ['Soissons']), ('lagyn', ['Lagny'])])
+def test_recherche_approchante(client, q, attendu):
+    assert rechercher(client, q) == attendu
+
+
+def test_recherche_limite(client):
+    assert rechercher(client, '', limite=2) == ['LAMART', 'LOGITRANS']
+    assert rechercher(client, 'xyz') == []
+    assert client.get('/api/transporteurs/recherche?q=l&limite=abc').status_code == 400
+
+
+# Une autre orthographe d'un transporteur connu est ramenée au nom enregistré
+def test_orthographe_canonique(client):
+    client.post('/api/enregistrer', json=mouvement(transporteur='LÂGNY'))
+    assert client.get('/api/transporteurs').get_json().count('Lagny') == 1
+    assert 'LÂGNY' not in client.get('/api/transporteurs').get_json()
+    assert [l['Transp'] for l in client.get('/api/entree').get_json()] == ['Lagny']